@@ -7,6 +7,10 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import json
+from agregacao_hierarquica import taxa_nacional
+from modelo_desemprego import (REGIOES, TAXA_BASE, PEA_BASE, EFEITO_PANDEMIA, DESVIO_RUIDO,
+                               DESVIO_PEA, CRESCIMENTO_PEA, TAXA_MINIMA, TAXA_MAXIMA,
+                               efeito_sazonal)
 
 # Configurar seed para reprodutibilidade
 np.random.seed(42)
@@ -17,7 +21,7 @@ end_date = datetime(2024, 12, 31)
 dates = pd.date_range(start=start_date, end=end_date, freq='MS')
 
 # Regiões do Brasil
-regioes = ['Norte', 'Nordeste', 'Centro-Oeste', 'Sudeste', 'Sul']
+regioes = REGIOES
 
 # Criar dataset
 data = []
@@ -32,42 +36,22 @@ for date in dates:
         # 2021-2022: Recuperação gradual
         # 2023-2024: Estabilização
         
-        base_rate = {
-            'Norte': 12.5,
-            'Nordeste': 14.2,
-            'Centro-Oeste': 10.8,
-            'Sudeste': 11.5,
-            'Sul': 9.2
-        }[regiao]
+        base_rate = TAXA_BASE[regiao]
         
         # Efeito da pandemia
-        if ano == 2020:
-            pandemia_effect = 4.5 + np.random.normal(0, 1)
-        elif ano == 2021:
-            pandemia_effect = 3.0 + np.random.normal(0, 0.8)
-        elif ano == 2022:
-            pandemia_effect = 1.5 + np.random.normal(0, 0.6)
-        elif ano == 2023:
-            pandemia_effect = 0.5 + np.random.normal(0, 0.4)
-        else:  # 2024
-            pandemia_effect = 0.2 + np.random.normal(0, 0.3)
+        media_pandemia, desvio_pandemia = EFEITO_PANDEMIA[ano]
+        pandemia_effect = media_pandemia + np.random.normal(0, desvio_pandemia)
         
         # Sazonalidade (fim de ano tem menos desemprego)
-        sazonalidade = -0.8 if mes == 12 else (0.5 if mes in [1, 2] else 0)
+        sazonalidade = efeito_sazonal(mes)
         
-        taxa_desemprego = base_rate + pandemia_effect + sazonalidade + np.random.normal(0, 0.5)
-        taxa_desemprego = max(5.0, min(20.0, taxa_desemprego))  # Limitar entre 5% e 20%
+        taxa_desemprego = base_rate + pandemia_effect + sazonalidade + np.random.normal(0, DESVIO_RUIDO)
+        taxa_desemprego = max(TAXA_MINIMA, min(TAXA_MAXIMA, taxa_desemprego))  # Limitar entre 5% e 20%
         
         # População economicamente ativa (em milhões)
-        pea_base = {
-            'Norte': 8.5,
-            'Nordeste': 27.3,
-            'Centro-Oeste': 8.2,
-            'Sudeste': 45.6,
-            'Sul': 15.4
-        }[regiao]
+        pea_base = PEA_BASE[regiao]
         
-        pea = pea_base * (1 + (ano - 2020) * 0.015) + np.random.normal(0, 0.2)
+        pea = pea_base * (1 + (ano - 2020) * CRESCIMENTO_PEA) + np.random.normal(0, DESVIO_PEA)
         
         # Calcular desempregados
         desempregados = (pea * taxa_desemprego / 100) * 1000000  # converter para pessoas
@@ -111,8 +95,8 @@ print(f"\n📊 Resumo do Dataset:")
 print(f"   - Período: {df['data'].min().strftime('%m/%Y')} a {df['data'].max().strftime('%m/%Y')}")
 print(f"   - Total de registros: {len(df)}")
 print(f"   - Regiões: {', '.join(regioes)}")
-print(f"   - Taxa média de desemprego: {df['taxa_desemprego'].mean():.2f}%")
-print(f"\n📈 Taxa de desemprego por ano:")
-print(df.groupby('ano')['taxa_desemprego'].mean().round(2))
+print(f"   - Taxa média de desemprego (ponderada pela PEA): {taxa_nacional(df, tempo=[]):.2f}%")
+print(f"\n📈 Taxa de desemprego por ano (ponderada pela PEA):")
+print(taxa_nacional(df).round(2))
 print(f"\n🌍 Taxa de desemprego por região:")
 print(df.groupby('regiao')['taxa_desemprego'].mean().round(2))
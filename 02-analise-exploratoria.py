@@ -7,6 +7,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
+from decomposicao_sazonal import decompor_painel, serie_nacional
+from deteccao_anomalias import detectar_em_blocos
+from agregacao_hierarquica import taxa_nacional
 
 # Configurar estilo
 plt.style.use('seaborn-v0_8-darkgrid')
@@ -29,18 +32,30 @@ print(df[['taxa_desemprego', 'populacao_economicamente_ativa', 'total_desemprega
 print("\n2️⃣ ANÁLISE TEMPORAL")
 print("-" * 80)
 
-# Taxa média por ano
+# Taxa média por ano (média simples das regiões e taxa nacional ponderada pela PEA)
 taxa_anual = df.groupby('ano')['taxa_desemprego'].agg(['mean', 'min', 'max', 'std'])
+taxa_anual['ponderada'] = taxa_nacional(df)
 print("\n📅 Taxa de Desemprego por Ano:")
 print(taxa_anual.round(2))
 
 # Variação percentual entre anos
-print("\n📉 Variação Percentual Anual:")
-for i in range(2021, 2025):
-    taxa_anterior = df[df['ano'] == i-1]['taxa_desemprego'].mean()
-    taxa_atual = df[df['ano'] == i]['taxa_desemprego'].mean()
+print("\n📉 Variação Percentual Anual (taxa ponderada):")
+for anterior, atual in zip(taxa_anual.index[:-1], taxa_anual.index[1:]):
+    taxa_anterior = taxa_anual.loc[anterior, 'ponderada']
+    taxa_atual = taxa_anual.loc[atual, 'ponderada']
     variacao = ((taxa_atual - taxa_anterior) / taxa_anterior) * 100
-    print(f"   {i-1} → {i}: {variacao:+.2f}%")
+    print(f"   {anterior} → {atual}: {variacao:+.2f}%")
+
+# Sazonalidade estimada por decomposição clássica, série a série (só para dados mensais)
+try:
+    df, indices_sazonais = decompor_painel(df)
+except ValueError as erro:
+    print(f"\n⚠️  Decomposição sazonal ignorada: {erro}")
+else:
+    print("\n📆 Fatores Sazonais por Região (p.p., decomposição aditiva):")
+    print(indices_sazonais.round(2))
+    print("\n📆 Taxa Nacional Observada vs Dessazonalizada (últimos 6 meses, %):")
+    print(serie_nacional(df).tail(6).round(2))
 
 # 3. Análise Regional
 print("\n3️⃣ ANÁLISE REGIONAL")
@@ -78,6 +93,20 @@ print(f"   Data: {melhor_mes['data'].strftime('%B %Y')}")
 print(f"   Região: {melhor_mes['regiao']}")
 print(f"   Taxa: {melhor_mes['taxa_desemprego']:.2f}%")
 
+# Top-k por região e alertas de variação abrupta (leitura em blocos)
+detector = detectar_em_blocos('dados_desemprego_brasil.csv', k=3)
+top_k = detector.top_k()
+print(f"\n📍 Top 3 Piores e Melhores Meses por Região:")
+for (regiao, tipo), grupo in top_k.groupby(['regiao', 'tipo'], sort=False):
+    periodos = ', '.join(f"{d.strftime('%m/%Y')} ({t:.2f}%)"
+                         for d, t in zip(grupo['data'], grupo['taxa_desemprego']))
+    print(f"   {regiao} - {tipo}: {periodos}")
+
+alertas = detector.alertas()
+print(f"\n🚨 Alertas de Variação Abrupta (|z| ≥ {detector.limiar:.1f}): {len(alertas)}")
+if not alertas.empty:
+    print(alertas.to_string(index=False, float_format='{:.2f}'.format, na_rep='—'))
+
 # 6. Análise de Correlação
 print("\n6️⃣ ANÁLISE DE CORRELAÇÃO")
 print("-" * 80)
@@ -92,16 +121,18 @@ print("\n7️⃣ PRINCIPAIS INSIGHTS")
 print("-" * 80)
 
 # Comparação pré e pós pandemia
-pre_pandemia = df[df['ano'] == 2020]['taxa_desemprego'].mean()
-pos_pandemia = df[df['ano'] == 2024]['taxa_desemprego'].mean()
+# (primeiro e último ano presentes no painel)
+ano_inicial, ano_final = taxa_anual.index[0], taxa_anual.index[-1]
+pre_pandemia = taxa_anual.loc[ano_inicial, 'ponderada']
+pos_pandemia = taxa_anual.loc[ano_final, 'ponderada']
 recuperacao = ((pre_pandemia - pos_pandemia) / pre_pandemia) * 100
 
 print(f"""
 ✅ INSIGHTS PRINCIPAIS:
 
 1. IMPACTO DA PANDEMIA:
-   - Taxa média em 2020 (pico): {pre_pandemia:.2f}%
-   - Taxa média em 2024 (atual): {pos_pandemia:.2f}%
+   - Taxa média em {ano_inicial} (início): {pre_pandemia:.2f}%
+   - Taxa média em {ano_final} (atual): {pos_pandemia:.2f}%
    - Recuperação: {recuperacao:.1f}%
 
 2. DISPARIDADES REGIONAIS:
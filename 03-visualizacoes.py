@@ -7,6 +7,10 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.gridspec import GridSpec
+from decomposicao_sazonal import decompor_painel
+from agregacao_hierarquica import taxa_nacional, desempregados_no_periodo
+from renderizador_graficos import renderizar_lote
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -43,6 +47,7 @@ ax1.legend(loc='upper right', frameon=True, shadow=True)
 ax1.grid(True, alpha=0.3)
 plt.tight_layout()
 plt.savefig('grafico_01_evolucao_temporal.png', dpi=300, bbox_inches='tight')
+plt.close(fig1)
 print("✅ Gráfico 1 salvo: grafico_01_evolucao_temporal.png")
 
 # ============================================================================
@@ -58,8 +63,8 @@ ax2a.set_title('Distribuição da Taxa de Desemprego por Ano',
 ax2a.set_xlabel('Ano', fontsize=12, fontweight='bold')
 ax2a.set_ylabel('Taxa de Desemprego (%)', fontsize=12, fontweight='bold')
 
-# Bar plot comparativo
-taxa_anual = df.groupby('ano')['taxa_desemprego'].mean()
+# Bar plot comparativo (taxa nacional ponderada pela PEA)
+taxa_anual = taxa_nacional(df)
 bars = ax2b.bar(taxa_anual.index, taxa_anual.values, color=sns.color_palette("coolwarm", len(taxa_anual)))
 ax2b.set_title('Taxa Média de Desemprego por Ano', fontsize=14, fontweight='bold')
 ax2b.set_xlabel('Ano', fontsize=12, fontweight='bold')
@@ -73,6 +78,7 @@ for bar in bars:
 
 plt.tight_layout()
 plt.savefig('grafico_02_comparacao_anual.png', dpi=300, bbox_inches='tight')
+plt.close(fig2)
 print("✅ Gráfico 2 salvo: grafico_02_comparacao_anual.png")
 
 # ============================================================================
@@ -115,6 +121,7 @@ ax3c.grid(True, alpha=0.3)
 
 plt.tight_layout()
 plt.savefig('grafico_03_analise_regional.png', dpi=300, bbox_inches='tight')
+plt.close(fig3)
 print("✅ Gráfico 3 salvo: grafico_03_analise_regional.png")
 
 # ============================================================================
@@ -183,6 +190,7 @@ for bar in bars:
 
 plt.tight_layout()
 plt.savefig('grafico_04_analise_demografica.png', dpi=300, bbox_inches='tight')
+plt.close(fig4)
 print("✅ Gráfico 4 salvo: grafico_04_analise_demografica.png")
 
 # ============================================================================
@@ -197,40 +205,44 @@ fig5.suptitle('DASHBOARD EXECUTIVO - DESEMPREGO NO BRASIL (2020-2024)',
 
 # KPIs principais
 ax5a = fig5.add_subplot(gs[0, 0])
-ax5a.text(0.5, 0.7, f"{df['taxa_desemprego'].mean():.1f}%", 
+ax5a.text(0.5, 0.7, f"{taxa_nacional(df, tempo=[]):.1f}%", 
           ha='center', va='center', fontsize=40, fontweight='bold', color='steelblue')
 ax5a.text(0.5, 0.3, 'Taxa Média\n2020-2024', 
           ha='center', va='center', fontsize=12, fontweight='bold')
 ax5a.axis('off')
 
 ax5b = fig5.add_subplot(gs[0, 1])
-variacao = ((df[df['ano']==2024]['taxa_desemprego'].mean() - 
-             df[df['ano']==2020]['taxa_desemprego'].mean()) / 
-            df[df['ano']==2020]['taxa_desemprego'].mean() * 100)
+variacao = (taxa_anual.iloc[-1] - taxa_anual.iloc[0]) / taxa_anual.iloc[0] * 100
 cor_variacao = 'green' if variacao < 0 else 'red'
 ax5b.text(0.5, 0.7, f"{variacao:+.1f}%", 
           ha='center', va='center', fontsize=40, fontweight='bold', color=cor_variacao)
-ax5b.text(0.5, 0.3, 'Variação\n2020→2024', 
+ax5b.text(0.5, 0.3, f'Variação\n{taxa_anual.index[0]}→{taxa_anual.index[-1]}', 
           ha='center', va='center', fontsize=12, fontweight='bold')
 ax5b.axis('off')
 
 ax5c = fig5.add_subplot(gs[0, 2])
-total_desemp = df['total_desempregados'].sum() / 1000000
-ax5c.text(0.5, 0.7, f"{total_desemp:.1f}M", 
+total_desemp, data_desemp = desempregados_no_periodo(df)
+ax5c.text(0.5, 0.7, f"{total_desemp / 1000000:.1f}M", 
           ha='center', va='center', fontsize=40, fontweight='bold', color='orangered')
-ax5c.text(0.5, 0.3, 'Total de\nDesempregados', 
+ax5c.text(0.5, 0.3, f"Desempregados\n({data_desemp.strftime('%m/%Y')})", 
           ha='center', va='center', fontsize=12, fontweight='bold')
 ax5c.axis('off')
 
 # Tendência geral
 ax5d = fig5.add_subplot(gs[1, :])
-df_mensal = df.groupby('data')['taxa_desemprego'].mean()
+df_mensal = taxa_nacional(df, tempo='data')
 ax5d.plot(df_mensal.index, df_mensal.values, linewidth=3, color='steelblue')
 ax5d.fill_between(df_mensal.index, df_mensal.values, alpha=0.3, color='steelblue')
-z = np.polyfit(range(len(df_mensal)), df_mensal.values, 2)
-p = np.poly1d(z)
-ax5d.plot(df_mensal.index, p(range(len(df_mensal))), 
-          "--", linewidth=2, color='red', label='Tendência')
+# Banda de incerteza do ensemble Monte Carlo (ensemble_monte_carlo.py), se disponível
+if os.path.exists('ensemble_bandas.csv'):
+    bandas = pd.read_csv('ensemble_bandas.csv', parse_dates=['data'])
+    ax5d.fill_between(bandas['data'], bandas['p05'], bandas['p95'], alpha=0.25,
+                      color='gray', label='Intervalo 90% (Monte Carlo)')
+if len(df_mensal) > 2:  # a parábola precisa de ao menos 3 períodos
+    z = np.polyfit(range(len(df_mensal)), df_mensal.values, 2)
+    p = np.poly1d(z)
+    ax5d.plot(df_mensal.index, p(range(len(df_mensal))), 
+              "--", linewidth=2, color='red', label='Tendência')
 ax5d.set_title('Tendência Geral da Taxa de Desemprego', fontsize=14, fontweight='bold')
 ax5d.set_ylabel('Taxa (%)', fontsize=11, fontweight='bold')
 ax5d.legend()
@@ -247,18 +259,27 @@ ax5e.set_xlabel('Taxa (%)', fontsize=10)
 for i, v in enumerate(top_regioes.values):
     ax5e.text(v + 0.1, i, f'{v:.1f}%', va='center', fontsize=9)
 
-# Sazonalidade
+# Sazonalidade (fatores da decomposição, média entre regiões)
 ax5f = fig5.add_subplot(gs[2, 1])
-sazonalidade = df.groupby('mes')['taxa_desemprego'].mean()
-meses = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 
-         'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-ax5f.plot(range(1, 13), sazonalidade.values, marker='o', linewidth=2, 
-          markersize=8, color='teal')
-ax5f.set_xticks(range(1, 13))
-ax5f.set_xticklabels(meses, rotation=45)
+try:
+    _, indices_sazonais = decompor_painel(df)
+except ValueError:
+    # Painel não mensal (ex.: trimestral da PNAD): sem padrão sazonal mensal
+    ax5f.text(0.5, 0.5, 'Padrão sazonal indisponível\n(dados não mensais)',
+              ha='center', va='center', fontsize=10, fontweight='bold')
+    ax5f.axis('off')
+else:
+    sazonalidade = indices_sazonais.mean()
+    meses = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 
+             'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+    ax5f.plot(range(1, 13), sazonalidade.values, marker='o', linewidth=2, 
+              markersize=8, color='teal')
+    ax5f.set_xticks(range(1, 13))
+    ax5f.set_xticklabels(meses, rotation=45)
+    ax5f.axhline(y=0, color='black', linestyle='--', alpha=0.5)
+    ax5f.set_ylabel('Efeito Sazonal (p.p.)', fontsize=10)
+    ax5f.grid(True, alpha=0.3)
 ax5f.set_title('Padrão Sazonal', fontsize=11, fontweight='bold')
-ax5f.set_ylabel('Taxa (%)', fontsize=10)
-ax5f.grid(True, alpha=0.3)
 
 # Grupos vulneráveis
 ax5g = fig5.add_subplot(gs[2, 2])
@@ -281,8 +302,16 @@ for bar in bars:
               f'{height:.1f}%', ha='center', va='bottom', fontsize=9, fontweight='bold')
 
 plt.savefig('grafico_05_dashboard_executivo.png', dpi=300, bbox_inches='tight')
+plt.close(fig5)
 print("✅ Gráfico 5 salvo: grafico_05_dashboard_executivo.png")
 
+# ============================================================================
+# GRÁFICOS POR REGIÃO: Pequenos múltiplos em lote
+# ============================================================================
+arquivos_regiao, _ = renderizar_lote(df, coluna_grupo='regiao', diretorio='graficos_regioes',
+                                     referencia=taxa_nacional(df, tempo='data'))
+print(f"✅ {len(arquivos_regiao)} gráficos por região salvos em: graficos_regioes/")
+
 print("\n🎉 Todas as visualizações foram geradas com sucesso!")
 print("\n📁 Arquivos gerados:")
 print("   - grafico_01_evolucao_temporal.png")
@@ -290,3 +319,4 @@ print("   - grafico_02_comparacao_anual.png")
 print("   - grafico_03_analise_regional.png")
 print("   - grafico_04_analise_demografica.png")
 print("   - grafico_05_dashboard_executivo.png")
+print("   - graficos_regioes/grafico_<regiao>.png")
@@ -4,12 +4,58 @@ Relatório Final - Análise de Desemprego no Brasil (2020-2024)
 
 import pandas as pd
 import numpy as np
+import os
 from datetime import datetime
+from decomposicao_sazonal import decompor_painel, serie_nacional
+from deteccao_anomalias import detectar_em_blocos
+from agregacao_hierarquica import taxa_nacional
 
 # Carregar dados
 df = pd.read_csv('dados_desemprego_brasil.csv')
 df['data'] = pd.to_datetime(df['data'])
 
+# Taxa nacional ponderada pela PEA (razão entre desempregados e PEA somados)
+taxa_anual = taxa_nacional(df)
+
+# Fatores sazonais por decomposição aditiva (média entre regiões; só para dados mensais)
+nomes_meses = ['janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho',
+               'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro']
+LIMIAR_SAZONAL = 0.2  # p.p.; efeitos menores são tratados como desprezíveis
+
+
+def descrever_efeito(efeito, periodo, motivo_alta='', motivo_queda=''):
+    """Frase sobre um efeito sazonal conforme o sinal e o tamanho estimados."""
+    if abs(efeito) < LIMIAR_SAZONAL:
+        return f"sem efeito relevante em {periodo} ({efeito:+.2f} p.p.)"
+    if efeito > 0:
+        return f"alta de {efeito:.2f} p.p. em {periodo}{motivo_alta}"
+    return f"queda de {-efeito:.2f} p.p. em {periodo}{motivo_queda}"
+
+try:
+    df, indices_sazonais = decompor_painel(df)
+except ValueError as erro:
+    texto_sazonal = f"""Padrão sazonal não estimado: {erro}."""
+else:
+    fatores_sazonais = indices_sazonais.mean()
+    nacional_mensal = serie_nacional(df)
+    ultimo_mes = nacional_mensal.index[-1]
+    efeito_jan_fev = descrever_efeito(
+        fatores_sazonais[[1, 2]].mean(), 'janeiro-fevereiro',
+        motivo_alta=', com o fim dos contratos temporários de fim de ano')
+    efeito_dez = descrever_efeito(
+        fatores_sazonais[12], 'dezembro',
+        motivo_queda=', relacionada às contratações temporárias para as festas de fim de ano')
+    texto_sazonal = f"""A decomposição sazonal (tendência pela média de cada ano, série a série, para não 
+confundir as quedas de nível entre um ano e outro com sazonalidade) estima 
+{efeito_jan_fev} 
+e {efeito_dez}. 
+Mês de maior efeito: {nomes_meses[fatores_sazonais.idxmax() - 1]} 
+({fatores_sazonais.max():+.2f} p.p.); menor: {nomes_meses[fatores_sazonais.idxmin() - 1]} ({fatores_sazonais.min():+.2f} p.p.). 
+Em {nomes_meses[ultimo_mes.month - 1]}/{ultimo_mes.year}, a taxa nacional dessazonalizada 
+foi de {nacional_mensal['dessazonalizada'].iloc[-1]:.2f}% (observada: {nacional_mensal['observada'].iloc[-1]:.2f}%), 
+com variação de {nacional_mensal['variacao_dessazonalizada'].iloc[-1]:+.2f} p.p. sobre o mês anterior 
+em termos dessazonalizados."""
+
 # Gerar relatório em Markdown
 relatorio = f"""
 # 📊 RELATÓRIO DE ANÁLISE DE DADOS
@@ -32,7 +78,7 @@ e visualizações de dados para identificar padrões, tendências e disparidades
 
 ### Principais Descobertas:
 
-1. **Impacto da Pandemia**: Taxa de desemprego atingiu pico em 2020, com média de {df[df['ano']==2020]['taxa_desemprego'].mean():.2f}%
+1. **Impacto da Pandemia**: Taxa de desemprego atingiu pico em {taxa_anual.index[0]}, com média de {taxa_anual.iloc[0]:.2f}%
 2. **Recuperação Gradual**: Redução consistente nos anos subsequentes
 3. **Disparidades Regionais**: Diferença de {df.groupby('regiao')['taxa_desemprego'].mean().max() - df.groupby('regiao')['taxa_desemprego'].mean().min():.2f} pontos percentuais entre regiões
 4. **Vulnerabilidade Jovem**: Taxa de desemprego entre jovens é {(df['taxa_desemprego_jovem'].mean() / df['taxa_desemprego'].mean() - 1) * 100:.1f}% maior que a média geral
@@ -66,11 +112,10 @@ e visualizações de dados para identificar padrões, tendências e disparidades
 
 ### 1. EVOLUÇÃO TEMPORAL
 
-#### Taxa Média de Desemprego por Ano:
+#### Taxa Média de Desemprego por Ano (ponderada pela PEA):
 """
 
-for ano in sorted(df['ano'].unique()):
-    taxa = df[df['ano']==ano]['taxa_desemprego'].mean()
+for ano, taxa in taxa_anual.items():
     relatorio += f"- **{ano}**: {taxa:.2f}%\n"
 
 relatorio += f"""
@@ -78,12 +123,12 @@ relatorio += f"""
 #### Variação Anual:
 """
 
-for i in range(2021, 2025):
-    taxa_anterior = df[df['ano'] == i-1]['taxa_desemprego'].mean()
-    taxa_atual = df[df['ano'] == i]['taxa_desemprego'].mean()
+for anterior, atual in zip(taxa_anual.index[:-1], taxa_anual.index[1:]):
+    taxa_anterior = taxa_anual[anterior]
+    taxa_atual = taxa_anual[atual]
     variacao = ((taxa_atual - taxa_anterior) / taxa_anterior) * 100
     simbolo = "📉" if variacao < 0 else "📈"
-    relatorio += f"- **{i-1} → {i}**: {variacao:+.2f}% {simbolo}\n"
+    relatorio += f"- **{anterior} → {atual}**: {variacao:+.2f}% {simbolo}\n"
 
 # Análise regional
 taxa_regional = df.groupby('regiao')['taxa_desemprego'].mean().sort_values(ascending=False)
@@ -117,6 +162,69 @@ relatorio += f"""
 - **Gap Jovem**: +{df['taxa_desemprego_jovem'].mean() - df['taxa_desemprego'].mean():.2f} pontos percentuais
 - **Gap Gênero**: +{df['taxa_desemprego_mulheres'].mean() - df['taxa_desemprego_homens'].mean():.2f} pontos percentuais (mulheres vs homens)
 
+### 4. PERÍODOS CRÍTICOS
+
+#### Piores Meses por Região (Top 3):
+"""
+
+# Top-k por região e alertas de variação abrupta
+detector = detectar_em_blocos('dados_desemprego_brasil.csv', k=3)
+piores = detector.top_k().query("tipo == 'pior'")
+
+for regiao, grupo in piores.groupby('regiao', sort=False):
+    periodos = ', '.join(f"{d.strftime('%m/%Y')} ({t:.2f}%)"
+                         for d, t in zip(grupo['data'], grupo['taxa_desemprego']))
+    relatorio += f"- **{regiao}**: {periodos}\n"
+
+alertas = detector.alertas()
+relatorio += f"""
+
+#### Alertas de Variação Abrupta (z-score móvel ou EWMA ≥ {detector.limiar:.1f}):
+
+As pontuações só começam após {detector.min_obs} meses de histórico em cada região. Um choque 
+já presente no início da série (como a alta de 2020, primeiro ano do período) serve de 
+referência para as primeiras janelas e por isso não pode ser detectado como anomalia.
+
+"""
+
+if alertas.empty:
+    relatorio += "- Nenhuma variação abrupta detectada\n"
+else:
+    relatorio += "\n| Região | Mês | Taxa | Variação | z móvel | z EWMA | Tipo |\n"
+    relatorio += "|---|---|---|---|---|---|---|\n"
+
+    def com_sinal(valor, sufixo=''):
+        # Pontuações e variações podem faltar no início de cada série
+        return '—' if pd.isna(valor) else f"{valor:+.2f}{sufixo}"
+
+    for _, alerta in alertas.iterrows():
+        relatorio += (f"| {alerta['regiao']} | {alerta['data'].strftime('%m/%Y')} | "
+                      f"{alerta['taxa_desemprego']:.2f}% | {com_sinal(alerta['variacao'], ' p.p.')} | "
+                      f"{com_sinal(alerta['z_movel'])} | {com_sinal(alerta['z_ewma'])} | {alerta['tipo']} |\n")
+
+relatorio += f"""
+
+### 5. SENSIBILIDADE AO RUÍDO DO MODELO
+"""
+
+# Intervalos do ensemble Monte Carlo (ensemble_monte_carlo.py), se disponível
+if os.path.exists('ensemble_intervalos.csv'):
+    ensemble = pd.read_csv('ensemble_intervalos.csv', index_col=0)
+    relatorio += f"""
+Intervalos de 90% obtidos com realizações independentes do modelo gerador:
+
+- **Gap regional**: {ensemble.loc['gap_regional', 'p50']:.2f} p.p. (IC 90%: {ensemble.loc['gap_regional', 'p05']:.2f} a {ensemble.loc['gap_regional', 'p95']:.2f})
+- **Recuperação 2020→2024**: {ensemble.loc['recuperacao', 'p50']:.1f}% (IC 90%: {ensemble.loc['recuperacao', 'p05']:.1f}% a {ensemble.loc['recuperacao', 'p95']:.1f}%)
+- **Efeito sazonal janeiro-fevereiro**: {ensemble.loc['efeito_jan_fev', 'p50']:+.2f} p.p. (IC 90%: {ensemble.loc['efeito_jan_fev', 'p05']:+.2f} a {ensemble.loc['efeito_jan_fev', 'p95']:+.2f})
+- **Efeito sazonal dezembro**: {ensemble.loc['efeito_dez', 'p50']:+.2f} p.p. (IC 90%: {ensemble.loc['efeito_dez', 'p05']:+.2f} a {ensemble.loc['efeito_dez', 'p95']:+.2f})
+"""
+else:
+    relatorio += """
+- Execute `ensemble_monte_carlo.py` para incluir os intervalos de incerteza
+"""
+
+relatorio += f"""
+
 ---
 
 ## 💡 INSIGHTS E CONCLUSÕES
@@ -144,9 +252,7 @@ Mulheres enfrentam maior dificuldade no mercado de trabalho, com taxas de desemp
 dupla jornada e discriminação no mercado.
 
 #### 5. Padrão Sazonal
-Identificou-se padrão sazonal consistente, com piores taxas no início do ano 
-(janeiro-fevereiro) e melhora no final do ano (dezembro), relacionado ao aumento 
-de contratações temporárias para festas de fim de ano.
+{texto_sazonal}
 
 ---
 
@@ -0,0 +1,188 @@
+"""
+Agregação Hierárquica Ponderada - Desemprego no Brasil
+Soma contagens (PEA e desempregados) de baixo para cima em uma hierarquia
+geográfica (ex.: município → UF → região → Brasil) e deriva as taxas como
+razão das somas, reaproveitando o resultado de cada nível no nível seguinte
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+NIVEL_NACIONAL = 'Brasil'
+
+
+def _codificar(df, colunas):
+    """Códigos inteiros para a combinação de colunas, mais os valores únicos."""
+    if not colunas:
+        return np.zeros(len(df), dtype=np.int64), pd.DataFrame(index=[0])
+    if len(colunas) == 1:
+        codigos, unicos = pd.factorize(df[colunas[0]], sort=True)
+        return codigos, pd.DataFrame({colunas[0]: unicos})
+    codigos = df.groupby(colunas, sort=True, observed=True).ngroup().to_numpy()
+    unicos = df[colunas].drop_duplicates().sort_values(colunas).reset_index(drop=True)
+    return codigos, unicos
+
+
+def agregar_hierarquia(df, niveis, tempo=('data',), ponderado=True,
+                       coluna_pea='populacao_economicamente_ativa',
+                       coluna_desocupados='total_desempregados',
+                       coluna_taxa='taxa_desemprego', escala_pea=1e6):
+    """
+    Agrega o painel em todos os níveis da hierarquia.
+
+    `niveis` vai do mais fino ao mais agregado (ex.: ['municipio', 'uf',
+    'regiao']); o nível nacional é acrescentado automaticamente. As linhas
+    do painel são lidas uma única vez, no nível mais fino; cada nível acima
+    é obtido somando a matriz (período × unidade) do nível imediatamente
+    abaixo.
+
+    Com `ponderado=True` a taxa é desocupados / PEA (ponderação pela PEA);
+    com `ponderado=False` é a média simples das taxas das linhas originais,
+    como nas médias usadas anteriormente nos scripts.
+
+    `escala_pea` converte a PEA para pessoas (no dataset ela está em milhões).
+    Levanta ValueError se alguma coluna de tempo ou de nível tiver NaN.
+    Retorna {nível: DataFrame} com as colunas de tempo, do nível e dos níveis
+    acima, 'pea', 'desocupados', 'n_linhas' (linhas do painel original somadas
+    na célula, em qualquer nível) e a coluna da taxa.
+    """
+    niveis = list(niveis)
+    tempo = [tempo] if isinstance(tempo, str) else list(tempo)
+    chaves_ausentes = [c for c in tempo + niveis if df[c].isna().any()]
+    if chaves_ausentes:
+        raise ValueError("Valores ausentes nas colunas de agrupamento: "
+                         f"{', '.join(chaves_ausentes)}")
+
+    codigo_tempo, periodos = _codificar(df, tempo)
+    n_periodos = len(periodos)
+
+    # Única passagem pelas linhas: somas por (período × unidade do nível mais fino)
+    codigo_unidade, unidades = _codificar(df, niveis[:1])
+    # Pai de cada unidade em cada nível acima (primeira ocorrência)
+    primeira = np.unique(codigo_unidade, return_index=True)[1]
+    for nivel in niveis[1:]:
+        unidades[nivel] = df[nivel].to_numpy()[primeira]
+    n_unidades = len(unidades)
+
+    celula = codigo_tempo * n_unidades + codigo_unidade
+    pesos = {
+        'pea': df[coluna_pea].to_numpy(dtype=float) * escala_pea,
+        'desocupados': df[coluna_desocupados].to_numpy(dtype=float),
+        'soma_taxas': df[coluna_taxa].to_numpy(dtype=float),
+        'n_linhas': None,
+    }
+    somas = {nome: np.bincount(celula, weights=valores, minlength=n_periodos * n_unidades)
+             .reshape(n_periodos, n_unidades) for nome, valores in pesos.items()}
+
+    resultados = {}
+    for i, nivel in enumerate(niveis + [NIVEL_NACIONAL]):
+        if i > 0:
+            # Soma as colunas das unidades filhas em cada unidade pai
+            codigo_pai, pais = _codificar(unidades, niveis[i:])
+            n_pais = len(pais)
+            indices = (np.arange(n_periodos)[:, None] * n_pais + codigo_pai[None, :]).ravel()
+            somas = {nome: np.bincount(indices, weights=valores.ravel(),
+                                       minlength=n_periodos * n_pais).reshape(n_periodos, n_pais)
+                     for nome, valores in somas.items()}
+            unidades, n_unidades = pais, n_pais
+
+        resultados[nivel] = _tabela_nivel(periodos, unidades, somas, coluna_taxa, ponderado)
+    return resultados
+
+
+def _tabela_nivel(periodos, unidades, somas, coluna_taxa, ponderado):
+    n_periodos, n_unidades = somas['pea'].shape
+    linha_periodo = np.repeat(np.arange(n_periodos), n_unidades)
+    linha_unidade = np.tile(np.arange(n_unidades), n_periodos)
+    tabela = pd.concat([
+        periodos.iloc[linha_periodo].reset_index(drop=True),
+        unidades.iloc[linha_unidade].reset_index(drop=True),
+    ], axis=1)
+    for nome, valores in somas.items():
+        tabela[nome] = valores.ravel()
+    tabela = tabela[tabela['n_linhas'] > 0].reset_index(drop=True)
+    tabela['n_linhas'] = tabela['n_linhas'].astype(np.int64)
+
+    if ponderado:
+        tabela[coluna_taxa] = tabela['desocupados'] / tabela['pea'] * 100
+    else:
+        tabela[coluna_taxa] = tabela['soma_taxas'] / tabela['n_linhas']
+    return tabela.drop(columns='soma_taxas')
+
+
+def taxa_nacional(df, tempo='ano', ponderado=True, niveis=('regiao',), **kwargs):
+    """
+    Taxa nacional por período como Series indexada pelas colunas de tempo,
+    ou um único valor para todo o painel quando `tempo` é vazio.
+    """
+    nacional = agregar_hierarquia(df, niveis, tempo=tempo, ponderado=ponderado,
+                                  **kwargs)[NIVEL_NACIONAL]
+    coluna_taxa = kwargs.get('coluna_taxa', 'taxa_desemprego')
+    if not tempo:
+        return nacional[coluna_taxa].iloc[0]
+    return nacional.set_index(tempo)[coluna_taxa]
+
+
+def desempregados_no_periodo(df, data=None, coluna_data='data',
+                             coluna_desocupados='total_desempregados'):
+    """
+    Estoque de desempregados em uma data (a mais recente, por padrão),
+    somando as unidades geográficas daquele mês em vez de acumular meses.
+    """
+    if data is None:
+        data = df[coluna_data].max()
+    return df.loc[df[coluna_data] == data, coluna_desocupados].sum(), data
+
+
+def _painel_municipal(n_municipios, n_meses, seed):
+    rng = np.random.default_rng(seed)
+    ufs = np.array([11, 12, 13, 14, 15, 16, 17, 21, 22, 23, 24, 25, 26, 27, 28, 29,
+                    31, 32, 33, 35, 41, 42, 43, 50, 51, 52, 53])
+    uf_municipio = rng.choice(ufs, size=n_municipios)
+    pea_municipio = rng.lognormal(mean=-4.5, sigma=1.3, size=n_municipios)  # em milhões
+    taxa_municipio = rng.uniform(5, 20, size=n_municipios)
+
+    municipio = np.tile(np.arange(n_municipios), n_meses)
+    taxa = np.repeat(rng.normal(0, 0.5, size=n_meses), n_municipios) + taxa_municipio[municipio]
+    pea = pea_municipio[municipio]
+    uf = uf_municipio[municipio]
+    return pd.DataFrame({
+        'data': np.repeat(pd.date_range('2005-01-01', periods=n_meses, freq='MS'), n_municipios),
+        'municipio': municipio,
+        'uf': uf,
+        'regiao': uf // 10,
+        'taxa_desemprego': taxa,
+        'populacao_economicamente_ativa': pea,
+        'total_desempregados': (pea * 1e6 * taxa / 100).round(),
+    })
+
+
+def benchmark(n_municipios=5570, anos=20, seed=42):
+    """Compara o rollup reaproveitado com reagrupar as linhas em cada nível."""
+    df = _painel_municipal(n_municipios, anos * 12, seed)
+    niveis = ['municipio', 'uf', 'regiao']
+    print(f"⏱️  Benchmark: {n_municipios:,} municípios × {anos * 12} meses ({len(df):,} linhas)")
+
+    inicio = time.perf_counter()
+    resultado = agregar_hierarquia(df, niveis)
+    duracao_rollup = time.perf_counter() - inicio
+    print(f"   Rollup hierárquico: {duracao_rollup:.3f}s")
+
+    inicio = time.perf_counter()
+    for i in range(len(niveis) + 1):
+        somas = df.groupby(['data'] + niveis[i:])[
+            ['populacao_economicamente_ativa', 'total_desempregados']].sum()
+        somas['total_desempregados'] / (somas['populacao_economicamente_ativa'] * 1e6) * 100
+    duracao_linhas = time.perf_counter() - inicio
+    print(f"   Reagrupando as linhas por nível: {duracao_linhas:.3f}s "
+          f"({duracao_linhas / duracao_rollup:.1f}x)")
+
+    nacional = resultado[NIVEL_NACIONAL]['taxa_desemprego'].mean()
+    simples = df.groupby('data')['taxa_desemprego'].mean().mean()
+    print(f"   Taxa nacional média: ponderada {nacional:.2f}% vs simples {simples:.2f}%")
+
+
+if __name__ == '__main__':
+    benchmark()
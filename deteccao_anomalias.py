@@ -0,0 +1,195 @@
+"""
+Detecção de Períodos Críticos - Desemprego no Brasil
+Top-k de piores e melhores períodos por região e pontuação de anomalias
+(z-score móvel e EWMA) calculados em uma única passagem sobre dados em blocos
+"""
+
+import heapq
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+class _EstadoSerie:
+    """Estado acumulado de uma série: janela móvel, EWMA e heaps de top-k."""
+
+    def __init__(self, janela):
+        self.janela = deque(maxlen=janela)
+        self.soma = 0.0
+        self.soma_quadrados = 0.0
+        self.ewma = None
+        self.ewvar = 0.0
+        self.n_ewma = 0
+        self.anterior = None
+        self.n_observacoes = 0  # posição da próxima observação na série
+        # Min-heaps de (chave, -posição, data): em empates no valor fica a
+        # observação mais antiga, independentemente do tamanho dos blocos
+        self.piores = []    # chave = valor: os k maiores
+        self.melhores = []  # chave = -valor: os k menores
+
+
+class DetectorPeriodosCriticos:
+    """
+    Processa o painel em blocos (DataFrames em ordem cronológica) mantendo,
+    por série, apenas o estado necessário: heaps limitados a k elementos para
+    o ranking e estatísticas móveis para as pontuações de anomalia. Nenhum
+    bloco anterior precisa ficar em memória.
+
+    As pontuações só começam depois de `min_obs` observações (por padrão, a
+    janela inteira), então um choque já presente no início da série não
+    pode ser detectado: ele vira a referência das primeiras janelas.
+    """
+
+    def __init__(self, k=5, janela=12, alpha=0.3, limiar=3.5, min_obs=None,
+                 coluna_serie='regiao', coluna_valor='taxa_desemprego',
+                 coluna_data='data'):
+        self.k = k
+        self.tamanho_janela = janela
+        self.alpha = alpha
+        self.limiar = limiar
+        self.min_obs = janela if min_obs is None else min_obs
+        self.coluna_serie = coluna_serie
+        self.coluna_valor = coluna_valor
+        self.coluna_data = coluna_data
+        self._estados = {}
+        self._alertas = []
+
+    def _estado(self, serie):
+        if serie not in self._estados:
+            self._estados[serie] = _EstadoSerie(self.tamanho_janela)
+        return self._estados[serie]
+
+    def _atualizar_top_k(self, estado, datas, valores):
+        # Cada bloco é reduzido aos candidatos de cada lado antes de tocar nos
+        # heaps: todos os valores iguais ou além do k-ésimo, para que um empate
+        # nessa posição não dependa de qual elemento o argpartition escolheria
+        n = len(valores)
+        posicoes = estado.n_observacoes + np.arange(n)
+        estado.n_observacoes += n
+        if n > self.k:
+            k_maior = np.partition(valores, n - self.k)[n - self.k]
+            k_menor = np.partition(valores, self.k - 1)[self.k - 1]
+            candidatos_piores = np.flatnonzero(valores >= k_maior)
+            candidatos_melhores = np.flatnonzero(valores <= k_menor)
+        else:
+            candidatos_piores = candidatos_melhores = np.arange(n)
+
+        for heap, chaves, candidatos in ((estado.piores, valores, candidatos_piores),
+                                         (estado.melhores, -valores, candidatos_melhores)):
+            for i in candidatos:
+                item = (chaves[i], -posicoes[i], datas[i])
+                if len(heap) < self.k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+
+    def _pontuar(self, serie, estado, datas, valores):
+        for data, x in zip(datas, valores):
+            z_movel = z_ewma = np.nan
+
+            n = len(estado.janela)
+            if n >= self.min_obs:
+                # Desvio padrão amostral (ddof=1) da janela
+                media = estado.soma / n
+                variancia = (estado.soma_quadrados - n * media ** 2) / (n - 1)
+                desvio = math.sqrt(max(variancia, 0.0))
+                if desvio > 0:
+                    z_movel = (x - media) / desvio
+
+            if estado.n_ewma >= self.min_obs and estado.ewvar > 0:
+                # ewvar subestima a variância do erro de previsão x - ewma
+                # pelo fator (1 - alpha) em regime estacionário
+                z_ewma = (x - estado.ewma) / math.sqrt(estado.ewvar / (1 - self.alpha))
+
+            if abs(z_movel) >= self.limiar or abs(z_ewma) >= self.limiar:
+                referencia = z_movel if not np.isnan(z_movel) else z_ewma
+                self._alertas.append({
+                    self.coluna_serie: serie,
+                    self.coluna_data: data,
+                    self.coluna_valor: x,
+                    'variacao': x - estado.anterior if estado.anterior is not None else np.nan,
+                    'z_movel': z_movel,
+                    'z_ewma': z_ewma,
+                    'tipo': 'alta' if referencia > 0 else 'queda',
+                })
+
+            # Atualiza a janela móvel (soma e soma dos quadrados em O(1))
+            if n == self.tamanho_janela:
+                saindo = estado.janela[0]
+                estado.soma -= saindo
+                estado.soma_quadrados -= saindo ** 2
+            estado.janela.append(x)
+            estado.soma += x
+            estado.soma_quadrados += x ** 2
+
+            # Atualiza média e variância exponenciais
+            if estado.ewma is None:
+                estado.ewma = x
+            else:
+                diferenca = x - estado.ewma
+                incremento = self.alpha * diferenca
+                estado.ewma += incremento
+                estado.ewvar = (1 - self.alpha) * (estado.ewvar + diferenca * incremento)
+            estado.n_ewma += 1
+            estado.anterior = x
+
+    def processar(self, bloco):
+        """
+        Consome um bloco do painel, em ordem cronológica dentro de cada série.
+        Meses sem valor (NaN) são ignorados: não entram no ranking nem nas
+        estatísticas móveis.
+        """
+        for serie, grupo in bloco.groupby(self.coluna_serie, sort=False):
+            estado = self._estado(serie)
+            datas = grupo[self.coluna_data].to_numpy()
+            valores = grupo[self.coluna_valor].to_numpy(dtype=float)
+            validos = ~np.isnan(valores)
+            datas, valores = datas[validos], valores[validos]
+            self._atualizar_top_k(estado, datas, valores)
+            self._pontuar(serie, estado, datas, valores)
+        return self
+
+    def top_k(self):
+        """
+        Tabela com os k piores e k melhores períodos de cada série; em empates
+        no valor, o período mais antigo vem primeiro.
+        """
+        linhas = []
+        for serie, estado in self._estados.items():
+            for posicao, (valor, _, data) in enumerate(sorted(estado.piores, reverse=True), 1):
+                linhas.append({self.coluna_serie: serie, 'tipo': 'pior', 'posicao': posicao,
+                               self.coluna_data: data, self.coluna_valor: valor})
+            for posicao, (valor, _, data) in enumerate(sorted(estado.melhores, reverse=True), 1):
+                linhas.append({self.coluna_serie: serie, 'tipo': 'melhor', 'posicao': posicao,
+                               self.coluna_data: data, self.coluna_valor: -valor})
+        return pd.DataFrame(linhas, columns=[self.coluna_serie, 'tipo', 'posicao',
+                                             self.coluna_data, self.coluna_valor])
+
+    def alertas(self):
+        """Tabela compacta de alertas, do mais intenso para o menos intenso."""
+        colunas = [self.coluna_serie, self.coluna_data, self.coluna_valor,
+                   'variacao', 'z_movel', 'z_ewma', 'tipo']
+        tabela = pd.DataFrame(self._alertas, columns=colunas)
+        if tabela.empty:
+            return tabela
+        intensidade = tabela[['z_movel', 'z_ewma']].abs().max(axis=1)
+        return tabela.loc[intensidade.sort_values(ascending=False).index].reset_index(drop=True)
+
+
+def detectar_em_blocos(caminho, tamanho_bloco=50_000, **kwargs):
+    """Executa o detector sobre um CSV lido em blocos, sem carregar o arquivo inteiro."""
+    detector = DetectorPeriodosCriticos(**kwargs)
+    coluna_data = detector.coluna_data
+    for bloco in pd.read_csv(caminho, chunksize=tamanho_bloco, parse_dates=[coluna_data]):
+        detector.processar(bloco)
+    return detector
+
+
+if __name__ == '__main__':
+    detector = detectar_em_blocos('dados_desemprego_brasil.csv', tamanho_bloco=50)
+    print("🔝 Top-k por região:")
+    print(detector.top_k().to_string(index=False, float_format='{:.2f}'.format))
+    print("\n🚨 Alertas:")
+    print(detector.alertas().to_string(index=False, float_format='{:.2f}'.format))
@@ -0,0 +1,175 @@
+"""
+Ensemble Monte Carlo - Desemprego no Brasil (2020-2024)
+Executa milhares de realizações independentes do modelo gerador em um pool de
+processos e resume cada uma dentro do próprio processo, para medir a
+sensibilidade das conclusões (gap regional, recuperação, efeito sazonal)
+ao ruído do modelo
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from decomposicao_sazonal import decompor
+from modelo_desemprego import REGIOES, datas_padrao, simular
+
+QUANTIS = [0.05, 0.5, 0.95]
+
+
+def resumir(taxa, pea, datas):
+    """
+    Reduz um lote de realizações (realizações × meses × regiões) às
+    estatísticas usadas na análise, sem manter os dados completos.
+    """
+    anos = datas.year.to_numpy()
+    desocupados = taxa * pea
+
+    # Taxa nacional mensal ponderada pela PEA (realizações × meses)
+    nacional = desocupados.sum(axis=2) / pea.sum(axis=2)
+
+    media_regional = taxa.mean(axis=1)
+    gap_regional = media_regional.max(axis=1) - media_regional.min(axis=1)
+
+    def taxa_ano(ano):
+        no_ano = anos == ano
+        return desocupados[:, no_ano].sum(axis=(1, 2)) / pea[:, no_ano].sum(axis=(1, 2))
+
+    inicial, final = taxa_ano(anos.min()), taxa_ano(anos.max())
+    recuperacao = (inicial - final) / inicial * 100
+
+    # Efeito sazonal pela mesma decomposição do relatório, com todas
+    # as séries (realizações × regiões) decompostas de uma vez
+    n_realizacoes, n_meses, n_regioes = taxa.shape
+    series = taxa.transpose(0, 2, 1).reshape(n_realizacoes * n_regioes, n_meses)
+    indices = decompor(series, mes_inicial=datas[0].month)['indices']
+    indices = indices.reshape(n_realizacoes, n_regioes, -1).mean(axis=1)
+    efeito_jan_fev = indices[:, [0, 1]].mean(axis=1)
+    efeito_dez = indices[:, 11]
+
+    escalares = np.column_stack([gap_regional, recuperacao, efeito_jan_fev, efeito_dez,
+                                 inicial, final])
+    return escalares, nacional
+
+
+COLUNAS_ESCALARES = ['gap_regional', 'recuperacao', 'efeito_jan_fev', 'efeito_dez',
+                     'taxa_inicial', 'taxa_final']
+
+
+def _memoria_pico_mb():
+    """Pico de memória residente do processo em MB, ou None fora do Unix."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em bytes no macOS e em KiB no Linux
+    return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+
+def _executar_tarefa(argumentos):
+    """Roda uma tarefa no processo filho e devolve só os resumos."""
+    semente, n_realizacoes, tamanho_lote = argumentos
+    rng = np.random.default_rng(semente)
+    datas = datas_padrao()
+
+    escalares, nacional = [], []
+    for inicio in range(0, n_realizacoes, tamanho_lote):
+        n = min(tamanho_lote, n_realizacoes - inicio)
+        taxa, pea = simular(rng, n, datas)
+        e, s = resumir(taxa, pea, datas)
+        escalares.append(e)
+        nacional.append(s)
+
+    return np.vstack(escalares), np.vstack(nacional), os.getpid(), _memoria_pico_mb()
+
+
+def executar_ensemble(n_realizacoes=5000, n_processos=None, seed=42,
+                      realizacoes_por_tarefa=250, tamanho_lote=50):
+    """
+    Executa o ensemble e retorna (estatísticas por realização, bandas da taxa
+    nacional mensal, informações de execução).
+
+    Cada tarefa recebe um filho de SeedSequence(seed).spawn(...), então o
+    resultado depende apenas de `seed`, `n_realizacoes` e
+    `realizacoes_por_tarefa`, e não do número de processos.
+    """
+    n_tarefas = -(-n_realizacoes // realizacoes_por_tarefa)
+    sementes = np.random.SeedSequence(seed).spawn(n_tarefas)
+    tamanhos = [realizacoes_por_tarefa] * (n_tarefas - 1)
+    tamanhos.append(n_realizacoes - realizacoes_por_tarefa * (n_tarefas - 1))
+    tarefas = [(s, n, tamanho_lote) for s, n in zip(sementes, tamanhos)]
+
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_processos) as pool:
+        resultados = list(pool.map(_executar_tarefa, tarefas))
+    duracao = time.perf_counter() - inicio
+
+    escalares = pd.DataFrame(np.vstack([r[0] for r in resultados]), columns=COLUNAS_ESCALARES)
+    nacional = np.vstack([r[1] for r in resultados])
+    bandas = pd.DataFrame(np.quantile(nacional, QUANTIS, axis=0).T,
+                          columns=[f'p{int(q * 100):02d}' for q in QUANTIS])
+    bandas.insert(0, 'data', datas_padrao())
+
+    memoria = {}
+    for _, _, pid, memoria_mb in resultados:
+        memoria[pid] = max(memoria.get(pid, 0), memoria_mb or 0)
+    execucao = {
+        'segundos': duracao,
+        'processos': len(memoria),
+        # None quando a plataforma não informa o pico de memória (Windows)
+        'memoria_max_mb': max(memoria.values()) or None,
+    }
+    return escalares, bandas, execucao
+
+
+def intervalos(escalares):
+    """Tabela com média e intervalo de 90% de cada estatística."""
+    tabela = escalares.quantile(QUANTIS).T
+    tabela.columns = [f'p{int(q * 100):02d}' for q in QUANTIS]
+    tabela.insert(0, 'media', escalares.mean())
+    return tabela
+
+
+def benchmark(n_realizacoes=5000):
+    """Escalonamento com o número de processos e memória por processo."""
+    n_cpus = os.cpu_count() or 1
+    processos = sorted({1, 2, 4, 8, n_cpus} & set(range(1, n_cpus + 1)))
+    print(f"⏱️  Benchmark: {n_realizacoes:,} realizações × {len(datas_padrao())} meses "
+          f"× {len(REGIOES)} regiões ({n_cpus} CPUs)")
+    referencia = None
+    for n in processos:
+        _, _, execucao = executar_ensemble(n_realizacoes, n_processos=n)
+        referencia = referencia or execucao['segundos']
+        memoria = execucao['memoria_max_mb']
+        memoria = f"{memoria:.0f} MB" if memoria is not None else "indisponível"
+        print(f"   {n} processo(s): {execucao['segundos']:.2f}s "
+              f"({n_realizacoes / execucao['segundos']:,.0f} realizações/s, "
+              f"speedup {referencia / execucao['segundos']:.2f}x, "
+              f"pico de memória por processo {memoria})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ensemble Monte Carlo do modelo gerador')
+    parser.add_argument('--realizacoes', type=int, default=5000)
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--benchmark', action='store_true')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.realizacoes)
+    else:
+        escalares, bandas, execucao = executar_ensemble(args.realizacoes, args.processos, args.seed)
+        intervalos(escalares).to_csv('ensemble_intervalos.csv')
+        bandas.to_csv('ensemble_bandas.csv', index=False)
+        print("✅ Ensemble concluído!")
+        print(f"   - Realizações: {len(escalares):,} em {execucao['segundos']:.2f}s "
+              f"({execucao['processos']} processo(s))")
+        print(f"\n📊 Intervalos de 90% das estatísticas:")
+        print(intervalos(escalares).round(2))
+        print("\n📁 Arquivos gerados: ensemble_intervalos.csv, ensemble_bandas.csv")
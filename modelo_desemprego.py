@@ -0,0 +1,87 @@
+"""
+Modelo Gerador de Dados de Desemprego (2020-2024)
+Parâmetros compartilhados pelo gerador (01-gerar-dados-desemprego.py) e uma
+versão vetorizada que simula várias realizações de uma vez
+"""
+
+import numpy as np
+import pandas as pd
+
+REGIOES = ['Norte', 'Nordeste', 'Centro-Oeste', 'Sudeste', 'Sul']
+
+# Taxa de desemprego base por região (%)
+TAXA_BASE = {
+    'Norte': 12.5,
+    'Nordeste': 14.2,
+    'Centro-Oeste': 10.8,
+    'Sudeste': 11.5,
+    'Sul': 9.2
+}
+
+# População economicamente ativa base por região (em milhões)
+PEA_BASE = {
+    'Norte': 8.5,
+    'Nordeste': 27.3,
+    'Centro-Oeste': 8.2,
+    'Sudeste': 45.6,
+    'Sul': 15.4
+}
+
+# Efeito da pandemia por ano: (média, desvio padrão) em pontos percentuais
+# 2020: Pico da pandemia (alta)
+# 2021-2022: Recuperação gradual
+# 2023-2024: Estabilização
+EFEITO_PANDEMIA = {
+    2020: (4.5, 1.0),
+    2021: (3.0, 0.8),
+    2022: (1.5, 0.6),
+    2023: (0.5, 0.4),
+    2024: (0.2, 0.3),
+}
+
+DESVIO_RUIDO = 0.5
+DESVIO_PEA = 0.2
+CRESCIMENTO_PEA = 0.015
+TAXA_MINIMA, TAXA_MAXIMA = 5.0, 20.0
+
+
+def efeito_sazonal(mes):
+    """Sazonalidade (fim de ano tem menos desemprego); aceita escalar ou array."""
+    mes = np.asarray(mes)
+    efeito = np.where(mes == 12, -0.8, np.where(np.isin(mes, [1, 2]), 0.5, 0.0))
+    return efeito if efeito.ndim else float(efeito)
+
+
+def datas_padrao():
+    """Meses de 2020 a 2024, como no gerador original."""
+    return pd.date_range(start='2020-01-01', end='2024-12-31', freq='MS')
+
+
+def simular(rng, n_realizacoes, datas=None):
+    """
+    Simula `n_realizacoes` independentes do modelo de uma só vez.
+
+    Retorna (taxa, pea), ambos com formato (realizações × meses × regiões),
+    com a taxa em % (arredondada e limitada como no gerador) e a PEA em
+    milhões. A distribuição de cada linha é a mesma do gerador; apenas a
+    ordem de consumo dos números aleatórios é diferente.
+    """
+    if datas is None:
+        datas = datas_padrao()
+    anos = datas.year.to_numpy()
+    meses = datas.month.to_numpy()
+    forma = (n_realizacoes, len(datas), len(REGIOES))
+
+    base = np.array([TAXA_BASE[r] for r in REGIOES])
+    media_pandemia = np.array([EFEITO_PANDEMIA[a][0] for a in anos])[None, :, None]
+    desvio_pandemia = np.array([EFEITO_PANDEMIA[a][1] for a in anos])[None, :, None]
+
+    taxa = (base + media_pandemia + rng.standard_normal(forma) * desvio_pandemia
+            + efeito_sazonal(meses)[None, :, None]
+            + rng.normal(0, DESVIO_RUIDO, size=forma))
+    taxa = np.round(np.clip(taxa, TAXA_MINIMA, TAXA_MAXIMA), 2)
+
+    pea_base = np.array([PEA_BASE[r] for r in REGIOES])
+    crescimento = 1 + (anos - anos.min()) * CRESCIMENTO_PEA
+    pea = pea_base * crescimento[None, :, None] + rng.normal(0, DESVIO_PEA, size=forma)
+    return taxa, pea
@@ -0,0 +1,262 @@
+"""
+Renderizador em Lote de Pequenos Múltiplos - Desemprego no Brasil
+Gera um gráfico por região/UF a partir de uma única figura-modelo: o layout é
+calculado uma vez e, para cada recorte, apenas os dados dos artistas são
+atualizados; a gravação dos PNGs acontece em uma thread separada
+"""
+
+import argparse
+import os
+import queue
+import re
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from agregacao_hierarquica import taxa_nacional
+
+
+class _EscritorPNG(threading.Thread):
+    """Codifica e grava as imagens renderizadas sem bloquear a thread principal."""
+
+    def __init__(self, tamanho_fila=16):
+        super().__init__(daemon=True)
+        self.fila = queue.Queue(maxsize=tamanho_fila)
+        self.erro = None
+        self.gravados = 0
+
+    def run(self):
+        while True:
+            item = self.fila.get()
+            if item is None:
+                break
+            caminho, imagem, dpi = item
+            try:
+                plt.imsave(caminho, imagem, dpi=dpi)
+                self.gravados += 1
+            except Exception as erro:  # repassado para a thread principal em fechar()
+                self.erro = erro
+
+    def fechar(self):
+        self.fila.put(None)
+        self.join()
+        if self.erro is not None:
+            raise self.erro
+
+
+def _nome_arquivo(texto):
+    texto = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '_', texto.lower()).strip('_')
+
+
+class RenderizadorLote:
+    """
+    Figura-modelo com duas áreas: série mensal (com a referência nacional) e
+    média anual em barras. Os limites dos eixos são fixos para todos os
+    recortes, o que mantém os pequenos múltiplos comparáveis e dispensa
+    recalcular escala e layout a cada gráfico.
+    """
+
+    def __init__(self, datas, anos, limite_y, referencia=None, dpi=150,
+                 figsize=(14, 5), rotulo_valor='Taxa de Desemprego (%)'):
+        self.datas = pd.DatetimeIndex(datas)
+        self.anos = list(anos)
+        self.dpi = dpi
+
+        with plt.style.context('seaborn-v0_8-whitegrid'):
+            # Figure + FigureCanvasAgg, fora do pyplot: nada fica registrado
+            # no gerenciador global de figuras
+            self.figura = Figure(figsize=figsize, dpi=dpi)
+            FigureCanvasAgg(self.figura)
+            ax_serie, ax_barras = self.figura.subplots(
+                1, 2, gridspec_kw={'width_ratios': [2.2, 1]})
+
+            if referencia is not None:
+                ax_serie.plot(referencia.index, referencia.values, linewidth=1.5,
+                              color='gray', linestyle='--', label='Brasil (ponderada)')
+            self.linha, = ax_serie.plot(self.datas, np.zeros(len(self.datas)),
+                                        linewidth=2.5, color='steelblue', label='Recorte')
+            ax_serie.axvspan(pd.Timestamp('2020-03-01'), pd.Timestamp('2021-12-31'),
+                             alpha=0.15, color='red')
+            ax_serie.set_xlim(self.datas.min(), self.datas.max())
+            ax_serie.set_ylim(*limite_y)
+            ax_serie.set_ylabel(rotulo_valor, fontsize=11, fontweight='bold')
+            ax_serie.legend(loc='upper right')
+            ax_serie.grid(True, alpha=0.3)
+            self.texto_ultimo = ax_serie.text(0.02, 0.05, '', transform=ax_serie.transAxes,
+                                              fontsize=10, fontweight='bold')
+
+            posicoes = np.arange(len(self.anos))
+            self.barras = ax_barras.bar(posicoes, np.zeros(len(self.anos)),
+                                        color=plt.get_cmap('coolwarm')(np.linspace(0, 1, len(self.anos))))
+            ax_barras.set_xticks(posicoes)
+            ax_barras.set_xticklabels(self.anos)
+            ax_barras.set_ylim(0, limite_y[1] * 1.1)
+            ax_barras.set_title('Taxa Média por Ano', fontsize=12, fontweight='bold')
+            self.textos_barras = [
+                ax_barras.text(x, 0, '', ha='center', va='bottom', fontweight='bold', fontsize=9)
+                for x in posicoes
+            ]
+
+            self.titulo = self.figura.suptitle('', fontsize=15, fontweight='bold')
+            # Layout calculado uma única vez, com um título de tamanho típico
+            self.titulo.set_text('Taxa de Desemprego - Recorte')
+            self.figura.tight_layout()
+
+        # Artistas que mudam entre recortes ficam fora do fundo estático, que é
+        # desenhado uma vez e restaurado a cada gráfico (blitting)
+        self.animados = [self.titulo, self.linha, self.texto_ultimo,
+                         *self.barras, *self.textos_barras]
+        for artista in self.animados:
+            artista.set_animated(True)
+        self.figura.canvas.draw()
+        self.fundo = self.figura.canvas.copy_from_bbox(self.figura.bbox)
+
+    def renderizar(self, titulo, valores, medias_anuais):
+        """Atualiza os artistas e devolve a imagem RGBA renderizada."""
+        self.titulo.set_text(titulo)
+        self.linha.set_data(self.datas, valores)
+        ultimo = valores[~np.isnan(valores)][-1] if np.isfinite(valores).any() else np.nan
+        self.texto_ultimo.set_text(f'Último: {ultimo:.1f}%')
+        for barra, texto, media in zip(self.barras, self.textos_barras, medias_anuais):
+            altura = 0.0 if np.isnan(media) else media
+            barra.set_height(altura)
+            texto.set_y(altura)
+            texto.set_text('' if np.isnan(media) else f'{media:.1f}%')
+
+        canvas = self.figura.canvas
+        canvas.restore_region(self.fundo)
+        for artista in self.animados:
+            self.figura.draw_artist(artista)
+        return np.asarray(canvas.buffer_rgba()).copy()
+
+    def fechar(self):
+        self.figura.clear()
+
+
+def renderizar_lote(df, coluna_grupo='regiao', coluna_valor='taxa_desemprego',
+                    coluna_data='data', diretorio='graficos_recortes', dpi=150,
+                    referencia=None, titulo='Taxa de Desemprego - {}'):
+    """
+    Gera um PNG por valor de `coluna_grupo`. Retorna a lista de arquivos
+    gravados (em ordem) e o tempo total em segundos.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    inicio = time.perf_counter()
+
+    matriz = df.pivot_table(index=coluna_grupo, columns=coluna_data,
+                            values=coluna_valor, aggfunc='mean').sort_index(axis=1)
+    datas = pd.DatetimeIndex(matriz.columns)
+    anos = sorted(datas.year.unique())
+    medias = matriz.T.groupby(datas.year).mean().T.reindex(columns=anos)
+
+    minimo, maximo = np.nanmin(matriz.values), np.nanmax(matriz.values)
+    if referencia is not None:
+        minimo, maximo = min(minimo, referencia.min()), max(maximo, referencia.max())
+    margem = (maximo - minimo) * 0.05
+    renderizador = RenderizadorLote(datas, anos, (minimo - margem, maximo + margem),
+                                    referencia=referencia, dpi=dpi)
+
+    escritor = _EscritorPNG()
+    escritor.start()
+    arquivos = []
+    try:
+        for grupo, valores in zip(matriz.index, matriz.to_numpy()):
+            imagem = renderizador.renderizar(titulo.format(grupo), valores,
+                                             medias.loc[grupo].to_numpy())
+            caminho = os.path.join(diretorio, f'grafico_{_nome_arquivo(grupo)}.png')
+            escritor.fila.put((caminho, imagem, dpi))
+            arquivos.append(caminho)
+    finally:
+        escritor.fechar()
+        renderizador.fechar()
+    return arquivos, time.perf_counter() - inicio
+
+
+def _memoria_mb():
+    """Pico de memória residente do processo em MB, ou None fora do Unix."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em bytes no macOS e em KiB no Linux
+    return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+
+def _crescimento_memoria(antes):
+    depois = _memoria_mb()
+    if antes is None or depois is None:
+        return "memória indisponível"
+    return f"memória +{depois - antes:.0f} MB"
+
+
+def _renderizar_ingenuo(df, diretorio, dpi):
+    """Abordagem anterior: figura nova, tight_layout e bbox 'tight' por gráfico."""
+    for grupo, dados in df.groupby('recorte'):
+        fig, (ax_a, ax_b) = plt.subplots(1, 2, figsize=(14, 5))
+        ax_a.plot(dados['data'], dados['taxa_desemprego'], linewidth=2.5, color='steelblue')
+        anual = dados.groupby('ano')['taxa_desemprego'].mean()
+        barras = ax_b.bar(anual.index, anual.values)
+        for barra in barras:
+            ax_b.text(barra.get_x() + barra.get_width() / 2., barra.get_height(),
+                      f'{barra.get_height():.1f}%', ha='center', va='bottom')
+        fig.suptitle(f'Taxa de Desemprego - {grupo}', fontsize=15, fontweight='bold')
+        plt.tight_layout()
+        plt.savefig(os.path.join(diretorio, f'grafico_{grupo}.png'), dpi=dpi, bbox_inches='tight')
+
+
+def benchmark(n_recortes=200, anos=5, dpi=100, seed=42):
+    """Gráficos por segundo e crescimento de memória: lote vs abordagem anterior."""
+    rng = np.random.default_rng(seed)
+    datas = pd.date_range('2020-01-01', periods=anos * 12, freq='MS')
+    recorte = np.repeat([f'R{i:04d}' for i in range(n_recortes)], len(datas))
+    df = pd.DataFrame({
+        'recorte': recorte,
+        'data': np.tile(datas, n_recortes),
+        'ano': np.tile(datas.year, n_recortes),
+        'taxa_desemprego': (rng.uniform(6, 16, size=(n_recortes, 1))
+                            + rng.normal(0, 0.8, size=(n_recortes, len(datas)))).ravel(),
+    })
+    print(f"⏱️  Benchmark: {n_recortes} gráficos × {len(datas)} meses (dpi={dpi})")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        memoria = _memoria_mb()
+        arquivos, duracao = renderizar_lote(df, coluna_grupo='recorte',
+                                            diretorio=diretorio, dpi=dpi)
+        print(f"   Lote (modelo reutilizado): {len(arquivos) / duracao:.1f} gráficos/s, "
+              f"{_crescimento_memoria(memoria)}")
+
+        memoria = _memoria_mb()
+        inicio = time.perf_counter()
+        _renderizar_ingenuo(df, diretorio, dpi)
+        duracao = time.perf_counter() - inicio
+        print(f"   Anterior (figura nova por gráfico): {n_recortes / duracao:.1f} gráficos/s, "
+              f"{_crescimento_memoria(memoria)}, "
+              f"{len(plt.get_fignums())} figuras abertas")
+        plt.close('all')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gráficos por região/UF em lote')
+    parser.add_argument('--dados', default='dados_desemprego_brasil.csv')
+    parser.add_argument('--grupo', default='regiao')
+    parser.add_argument('--saida', default='graficos_recortes')
+    parser.add_argument('--benchmark', action='store_true')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+    else:
+        df = pd.read_csv(args.dados, parse_dates=['data'])
+        arquivos, duracao = renderizar_lote(df, coluna_grupo=args.grupo, diretorio=args.saida,
+                                            referencia=taxa_nacional(df, tempo='data'))
+        print(f"✅ {len(arquivos)} gráficos gerados em {duracao:.2f}s ({args.saida}/)")